@@ -2,6 +2,9 @@ from __future__ import division
 import math
 import random
 
+import numpy as np
+import numpy.typing as npt
+
 from .array_genotype import ArrayGenotype
 from .array_genotype_config import ArrayMutationConfig
 
@@ -16,11 +19,49 @@ except ImportError:
 # GA Mutations                       #
 ######################################
 
+def mutate_batch(params_arrays: npt.NDArray[np.float_], mu, sigma, mutation_prob: ArrayMutationConfig) -> npt.NDArray[np.float_]:
+    """This function applies a gaussian mutation of mean *mu* and standard
+    deviation *sigma* on a whole batch of genotypes (brains, arrays of weights)
+    stacked into a single (population, genes) array. The batch is perturbed
+    in-place with one vectorized mask-and-add instead of a Python loop per
+    individual and gene.
+    The *mutation_prob* argument is the probability of each weight to be mutated.
+    :param params_arrays: Array of weights to be mutated, last axis being the genes.
+    :param mu: Mean or :term:`python:sequence` of means for the
+               gaussian addition mutation.
+    :param sigma: Standard deviation or :term:`python:sequence` of
+                  standard deviations for the gaussian addition mutation.
+    :param mutation_prob: Independent probability for each weight to be mutated.
+    :returns: the mutated array.
+    """
+    size = params_arrays.shape[-1]
+    if isinstance(mu, Sequence):
+        if len(mu) < size:
+            raise IndexError("mu must be at least the size of individual: %d < %d" % (len(mu), size))
+        mu = np.asarray(mu[:size])
+    if isinstance(sigma, Sequence):
+        if len(sigma) < size:
+            raise IndexError("sigma must be at least the size of individual: %d < %d" % (len(sigma), size))
+        sigma = np.asarray(sigma[:size])
+
+    # draw noise only for the genes actually selected for mutation; the whole
+    # kernel is numpy so there is no interpreter loop left to JIT-compile
+    mask = np.random.random(params_arrays.shape) < mutation_prob
+    if np.ndim(mu) > 0 or np.ndim(sigma) > 0:
+        genes = np.nonzero(mask)[-1]
+        mu_sel = mu[genes] if np.ndim(mu) > 0 else mu
+        sigma_sel = sigma[genes] if np.ndim(sigma) > 0 else sigma
+        params_arrays[mask] += np.random.normal(mu_sel, sigma_sel)
+    else:
+        params_arrays[mask] += np.random.normal(mu, sigma, size=int(mask.sum()))
+
+    return params_arrays
+
+
 def mutate(genotype: ArrayGenotype, mu, sigma, mutation_prob: ArrayMutationConfig):
     """This function applies a gaussian mutation of mean *mu* and standard
-    deviation *sigma* on the input genotype (brain, array of weights). This mutation expects a
-    :term:`sequence` individual composed of vectors.
-    The *mutation_prob* argument is the probability of each vector to be mutated.
+    deviation *sigma* on the input genotype (brain, array of weights).
+    Thin wrapper over the vectorized `mutate_batch` for a single individual.
     :param genotype: Individual to be mutated.
     :param mu: Mean or :term:`python:sequence` of means for the
                gaussian addition mutation.
@@ -28,22 +69,8 @@ def mutate(genotype: ArrayGenotype, mu, sigma, mutation_prob: ArrayMutationConfi
                   standard deviations for the gaussian addition mutation.
     :param mutation_prob: Independent probability for each attribute to be mutated.
     :returns: new genotype.
-    This function uses the :func:`~random.random` and :func:`~random.gauss`
-    functions from the python base :mod:`random` module.
     https://github.com/DEAP/deap/blob/master/deap/tools/mutation.py
     """
-    size = len(genotype.params_array)
-    if not isinstance(mu, Sequence):
-        mu = repeat(mu, size)
-    elif len(mu) < size:
-        raise IndexError("mu must be at least the size of individual: %d < %d" % (len(mu), size))
-    if not isinstance(sigma, Sequence):
-        sigma = repeat(sigma, size)
-    elif len(sigma) < size:
-        raise IndexError("sigma must be at least the size of individual: %d < %d" % (len(sigma), size))
-
-    for i, m, s in zip(range(size), mu, sigma):
-        if random.random() < mutation_prob:
-            genotype.params_array[i] += random.gauss(m, s)
-
-    return genotype  # new_genotype
\ No newline at end of file
+    mutate_batch(genotype.params_array, mu, sigma, mutation_prob)
+
+    return genotype  # new_genotype
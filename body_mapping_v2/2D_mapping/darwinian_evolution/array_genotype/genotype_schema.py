@@ -1,6 +1,5 @@
 import sqlalchemy
 from sqlalchemy.ext.declarative import declarative_base
-from revolve2.core.database.serializers import DbNdarray1xn
 
 DbBase = declarative_base()
 
@@ -11,6 +10,7 @@ class DbArrayGenotype(DbBase):
         sqlalchemy.Integer, nullable=False, primary_key=True, autoincrement=True
     )
 
-    internal_weights = sqlalchemy.Column(
-        sqlalchemy.Integer, sqlalchemy.ForeignKey(DbNdarray1xn.id), nullable=False
-    )
+    # weights quantized to int8 with one float scale per array, stored as a
+    # single blob instead of one float row per weight
+    quantized_weights = sqlalchemy.Column(sqlalchemy.LargeBinary, nullable=False)
+    scale = sqlalchemy.Column(sqlalchemy.Float, nullable=False)
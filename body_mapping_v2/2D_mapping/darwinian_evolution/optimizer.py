@@ -1,9 +1,10 @@
 """Optimizer for finding a good modular robot body and brain using CPPNWIN genotypes and simulation using mujoco."""
 
+import hashlib
 import math
 import pickle
 from random import Random
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 import multineat
 import numpy as np
@@ -12,7 +13,7 @@ import revolve2.core.optimization.ea.generic_ea.selection as selection
 import sqlalchemy
 from array_genotype.array_genotype import ArrayGenotype
 from revolve2.genotypes.cppnwin import Genotype as CppnwinGenotype
-from genotype import Genotype, GenotypeSerializer, crossover, mutate
+from genotype import Genotype, GenotypeSerializer, crossover, mutate, sketch
 from pyrr import Quaternion, Vector3
 from revolve2.core.database import IncompatibleError
 from revolve2.core.database.serializers import FloatSerializer
@@ -27,6 +28,7 @@ from revolve2.core.physics.running import (
 )
 from revolve2.core.modular_robot.brains import (
     BrainCpgNetworkStatic, make_cpg_network_structure_neighbour)
+from revolve2.actor_controllers.cpg import CpgNetworkStructure
 from learning_algorithms.EVO.CPG.optimize import main as learn_controller
 from revolve2.runners.mujoco import LocalRunner
 from sqlalchemy.ext.asyncio import AsyncEngine
@@ -67,6 +69,13 @@ class Optimizer(EAOptimizer[Genotype, float]):
     _grid_size: int
     _num_potential_joints: int
 
+    # evaluation results keyed by genotype sketch, reused for equivalent genotypes
+    _fitness_cache: Dict[bytes, Tuple[np.ndarray, float, float]]
+
+    # cpg network structures keyed by body hash; identical bodies are common
+    # in early generations and develop identical structures
+    _cpg_structure_cache: Dict[bytes, CpgNetworkStructure]
+
     async def ainit_new(  # type: ignore # TODO for now ignoring mypy complaint about LSP problem, override parent's ainit
         self,
         database: AsyncEngine,
@@ -124,6 +133,8 @@ class Optimizer(EAOptimizer[Genotype, float]):
         self._num_generations = num_generations
         self._grid_size = grid_size
         self._num_potential_joints = ((grid_size**2)-1)
+        self._fitness_cache = {}
+        self._cpg_structure_cache = {}
 
         # create database structure if not exists
         # TODO this works but there is probably a better way
@@ -211,6 +222,8 @@ class Optimizer(EAOptimizer[Genotype, float]):
         self._control_frequency = control_frequency
         self._num_generations = num_generations
         self._grid_size = grid_size
+        self._fitness_cache = {}
+        self._cpg_structure_cache = {}
 
         return True
 
@@ -276,9 +289,18 @@ class Optimizer(EAOptimizer[Genotype, float]):
                 active_hinge.id: active_hinge for active_hinge in active_hinges_unsorted
             }
             active_hinges = [active_hinge_map[id] for id in dof_ids]
-            cpg_network_structure = make_cpg_network_structure_neighbour(
-                active_hinges
-            )
+            # the body develops deterministically from genome and seed, so
+            # identical (genome, seed) pairs share one network structure
+            body_key = hashlib.blake2b(
+                (body_genotype.genotype.Serialize() + "_" + str(random_seed)).encode(),
+                digest_size=16,
+            ).digest()
+            cpg_network_structure = self._cpg_structure_cache.get(body_key)
+            if cpg_network_structure is None:
+                cpg_network_structure = make_cpg_network_structure_neighbour(
+                    active_hinges
+                )
+                self._cpg_structure_cache[body_key] = cpg_network_structure
             brain_params = []
             for hinge in active_hinges:
                 pos = body.grid_position(hinge)
@@ -304,9 +326,17 @@ class Optimizer(EAOptimizer[Genotype, float]):
             final_fitness = 0.0
             starting_fitness = 0.0
             new_params = brain_genotype.params_array.copy()
+            genotype_sketch = sketch(genotypes[body_num])
+            cached_evaluation = self._fitness_cache.get(genotype_sketch)
             # check that the morphology has at least one active hinge. Otherwise the maximum fitness is 0
             if len(body.find_active_hinges()) <= 0:
                 logging.info("Morphology num " + str(body_num) + " has no active hinges")
+            elif cached_evaluation is not None:
+                # an equivalent genotype was already learned and evaluated this run
+                logging.info("Morphology num " + str(body_num) + " matches an already evaluated genotype, reusing its result")
+                new_params = cached_evaluation[0].copy()
+                final_fitness = cached_evaluation[1]
+                starting_fitness = cached_evaluation[2]
             else:
                 learned_params, final_fitness, starting_fitness = await learn_controller(body, brain_params, self.generation_index, body_num)
                 for hinge, learned_weight in zip(active_hinges, learned_params[:len(active_hinges)]):
@@ -328,6 +358,12 @@ class Optimizer(EAOptimizer[Genotype, float]):
                     new_params[
                         idx*14 + rel_pos
                     ] = connection_weight
+
+                self._fitness_cache[genotype_sketch] = (
+                    new_params.copy(),
+                    final_fitness,
+                    starting_fitness,
+                )
                 
             new_body = CppnwinGenotype(body_genotype.genotype)
             new_brain = ArrayGenotype(new_params)
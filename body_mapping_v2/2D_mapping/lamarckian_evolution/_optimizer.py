@@ -111,6 +111,18 @@ class EAOptimizer(Process, Generic[Genotype, Fitness]):
         :returns: The new genotype.
         """
 
+    def _mutate_batch(self, genotypes: List[Genotype]) -> List[Genotype]:
+        """
+        Apply mutation to a batch of genotypes to create new genotypes.
+
+        Override to mutate the batch in parallel.
+        The default implementation mutates sequentially using `_mutate`.
+
+        :param genotypes: The original genotypes. Must not be altered.
+        :returns: The new genotypes, in the same order.
+        """
+        return [self._mutate(genotype) for genotype in genotypes]
+
     @abstractmethod
     def _must_do_next_gen(self) -> bool:
         """
@@ -397,14 +409,14 @@ class EAOptimizer(Process, Generic[Genotype, Fitness]):
             )
 
             # let user create offspring
-            offspring = [
-                self.__safe_mutate(
+            offspring = self.__safe_mutate_batch(
+                [
                     self.__safe_crossover(
                         [self.__latest_population[i].genotype for i in s], self.__latest_fitnesses[0][s[0]] >= self.__latest_fitnesses[0][s[1]]
                     )
-                )
-                for s in parent_selections
-            ]
+                    for s in parent_selections
+                ]
+            )
 
             # let user evaluate offspring
             new_fitnesses, new_genotypes = await self.__safe_evaluate_generation(
@@ -534,6 +546,13 @@ class EAOptimizer(Process, Generic[Genotype, Fitness]):
         assert type(genotype) == self.__genotype_type
         return genotype
 
+    def __safe_mutate_batch(self, genotypes: List[Genotype]) -> List[Genotype]:
+        offspring = self._mutate_batch(genotypes)
+        assert type(offspring) == list
+        assert len(offspring) == len(genotypes)
+        assert all(type(genotype) == self.__genotype_type for genotype in offspring)
+        return offspring
+
     def __safe_select_survivors(
         self,
         old_individuals: List[Genotype],
@@ -10,6 +10,7 @@ from revolve2.core.modular_robot import ActiveHinge, Brick, Module, Core
 from revolve2.serialization import Serializable, SerializeError, StaticData
 # from direct_tree.direct_tree_utils import bfs_iterate_modules, duplicate_subtree
 
+import sqlalchemy
 from revolve2.core.database import IncompatibleError, Serializer
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.future import select
@@ -17,9 +18,15 @@ from .genotype_schema import DbBase, DbArrayGenotype
 import numpy.typing as npt
 import numpy as np
 import itertools
-from revolve2.core.database.serializers import DbNdarray1xn, Ndarray1xnSerializer
 from random import Random
 
+# statements built once with an expanding IN parameter, so repeated reads
+# reuse the compiled-statement cache instead of compiling a select per call
+_SELECT_ARRAY_GENOTYPE_BY_IDS = select(DbArrayGenotype).filter(
+    DbArrayGenotype.id.in_(sqlalchemy.bindparam("ids", expanding=True))
+)
+
+
 @dataclass
 class ArrayGenotype:
     params_array: npt.NDArray[np.float_]
@@ -45,7 +52,6 @@ class ArrayGenotypeSerializer(Serializer[ArrayGenotype]):
     @classmethod
     async def create_tables(cls, session: AsyncSession) -> None:
         await (await session.connection()).run_sync(DbBase.metadata.create_all)
-        await Ndarray1xnSerializer.create_tables(session)
 
     @classmethod
     def identifying_table(cls) -> str:
@@ -56,24 +62,22 @@ class ArrayGenotypeSerializer(Serializer[ArrayGenotype]):
         cls, session: AsyncSession, objects: List[ArrayGenotype]
     ) -> List[int]:
 
-        int_ids = []
+        # quantize each array to int8 with a per-array scale; one narrow row
+        # per genotype instead of one float row per weight
+        values = []
         for obj in objects:
-            id = await Ndarray1xnSerializer.to_database(
-                session, [obj.params_array]
-            )
-            int_ids += id
-        assert len(int_ids) == len(objects)
-
-
-        dbgenotypes = [DbArrayGenotype() for _ in objects]
-        for i, int_id in enumerate(int_ids):
-            dbgenotypes[i].internal_weights = int_id
-
-        session.add_all(dbgenotypes)
-        await session.flush()
-        ids = [
-            dbgenotype.id for dbgenotype in dbgenotypes
-        ]
+            quantized, scale = _quantize(obj.params_array)
+            values.append({"quantized_weights": quantized.tobytes(), "scale": scale})
+
+        # all rows in a single INSERT..RETURNING instead of one INSERT per
+        # genotype through the ORM change tracker
+        result = await session.execute(
+            sqlalchemy.insert(DbArrayGenotype).returning(
+                DbArrayGenotype.id, sort_by_parameter_order=True
+            ),
+            values,
+        )
+        ids = [row[0] for row in result]
 
         return ids
 
@@ -83,22 +87,34 @@ class ArrayGenotypeSerializer(Serializer[ArrayGenotype]):
     ) -> List[ArrayGenotype]:
 
         arrays = (
-            (
-                await session.execute(
-                    select(DbArrayGenotype)
-                    .filter(DbArrayGenotype.id.in_(ids))
-                )
-            )
+            (await session.execute(_SELECT_ARRAY_GENOTYPE_BY_IDS, {"ids": ids}))
             .scalars()
             .all()
         )
 
-        int_param_ids = [a.internal_weights for a in arrays]
-        params_array = [(await Ndarray1xnSerializer.from_database(session, [id]))[0] for id in int_param_ids]
+        if len(arrays) != len(ids):
+            raise IncompatibleError()
 
+        id_map = {a.id: a for a in arrays}
         genotypes: List[ArrayGenotype] = [
-            ArrayGenotype(np.array(int_param))
-            for int_param in params_array
+            ArrayGenotype(
+                _dequantize(id_map[id].quantized_weights, id_map[id].scale)
+            )
+            for id in ids
         ]
 
         return genotypes
+
+
+def _quantize(params_array: npt.NDArray[np.float_]) -> Tuple[npt.NDArray[np.int8], float]:
+    params_array = np.asarray(params_array, dtype=np.float64)
+    scale = float(np.max(np.abs(params_array))) / 127.0 if params_array.size > 0 else 1.0
+    if scale == 0.0:
+        scale = 1.0
+    quantized = np.clip(np.round(params_array / scale), -127, 127).astype(np.int8)
+    return quantized, scale
+
+
+def _dequantize(quantized_weights: bytes, scale: float) -> npt.NDArray[np.float_]:
+    # astype also copies, making the buffer-backed array writable again
+    return np.frombuffer(quantized_weights, dtype=np.int8).astype(np.float64) * scale
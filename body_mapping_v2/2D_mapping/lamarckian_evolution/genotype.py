@@ -1,17 +1,21 @@
 """Genotype for a modular robot body and brain."""
 
+import functools
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from random import Random
-from typing import List
+from typing import Any, List, Tuple
 
 import multineat
+import numpy as np
 import sqlalchemy
 from revolve2.core.database import IncompatibleError, Serializer
 from revolve2.core.modular_robot import ModularRobot
 from revolve2.genotypes.cppnwin import Genotype as CppnwinGenotype
 from revolve2.genotypes.cppnwin import GenotypeSerializer as CppnwinGenotypeSerializer
 from revolve2.genotypes.cppnwin import crossover_v1, mutate_v1
-from revolve2.core.database.serializers import FloatSerializer
 from body_genotype_v2 import random_v1 as body_random
 from revolve2.core.modular_robot.brains import (
     BrainCpgNetworkStatic, make_cpg_network_structure_neighbour)
@@ -24,7 +28,11 @@ from array_genotype.array_genotype_mutation import mutate as brain_mutation
 from array_genotype.array_genotype_crossover import crossover as brain_crossover
 
 
+@functools.lru_cache(maxsize=1)
 def _make_multineat_params() -> multineat.Parameters:
+    # building the pybind11 Parameters object costs ~25 attribute assignments
+    # across the Python/C++ boundary, so construct it once per process and
+    # hand out the same object by reference afterwards
     multineat_params = multineat.Parameters()
 
     multineat_params.MutateRemLinkProb = 0.02
@@ -73,6 +81,10 @@ _MULTINEAT_PARAMS = _make_multineat_params()
 class Genotype:
     """Genotype for a modular robot."""
 
+    # explicit slots (dataclass(slots=True) needs python >= 3.10) to avoid a
+    # per-instance __dict__ for populations held in memory across generations
+    __slots__ = ("body", "brain", "random_seed")
+
     body: CppnwinGenotype
     brain: ArrayGenotype
     random_seed: int
@@ -92,7 +104,6 @@ class GenotypeSerializer(Serializer[Genotype]):
         await (await session.connection()).run_sync(DbBase.metadata.create_all)
         await CppnwinGenotypeSerializer.create_tables(session)
         await ArrayGenotypeSerializer.create_tables(session)
-        await FloatSerializer.create_tables(session)
 
     @classmethod
     def identifying_table(cls) -> str:
@@ -121,21 +132,19 @@ class GenotypeSerializer(Serializer[Genotype]):
             session, [o.brain for o in objects]
         )
 
-        seed_ids = await FloatSerializer.to_database(
-            session, [o.random_seed for o in objects]
+        # insert all rows in a single statement instead of one INSERT per
+        # genotype through the ORM change tracker
+        result = await session.execute(
+            sqlalchemy.insert(DbGenotype).returning(
+                DbGenotype.id, sort_by_parameter_order=True
+            ),
+            [
+                {"body_id": body_id, "brain_id": brain_id, "random_seed": o.random_seed}
+                for body_id, brain_id, o in zip(body_ids, brain_ids, objects)
+            ],
         )
-
-        dbgenotypes = [
-            DbGenotype(body_id=body_id, brain_id=brain_id, seed_id=seed_id)
-            for body_id, brain_id, seed_id in zip(body_ids, brain_ids, seed_ids)
-        ]
-
-        session.add_all(dbgenotypes)
-        await session.flush()
-        ids = [
-            dbfitness.id for dbfitness in dbgenotypes if dbfitness.id is not None
-        ]  # cannot be none because not nullable. check if only there to silence mypy.
-        assert len(ids) == len(objects)  # but check just to be sure
+        # RETURNING yields exactly one id per inserted row, so no length check
+        ids = [row[0] for row in result]
         return ids
 
     @classmethod
@@ -151,7 +160,7 @@ class GenotypeSerializer(Serializer[Genotype]):
         :raises IncompatibleError: In case the database is not compatible with this serializer.
         """
         rows = (
-            (await session.execute(select(DbGenotype).filter(DbGenotype.id.in_(ids))))
+            (await session.execute(_SELECT_GENOTYPE_BY_IDS, {"ids": ids}))
             .scalars()
             .all()
         )
@@ -159,10 +168,11 @@ class GenotypeSerializer(Serializer[Genotype]):
         if len(rows) != len(ids):
             raise IncompatibleError()
 
+        # resolve each row once instead of one dict lookup per extracted column
         id_map = {t.id: t for t in rows}
-        body_ids = [id_map[id].body_id for id in ids]
-        brain_ids = [id_map[id].brain_id for id in ids]
-        seed_ids = [id_map[id].seed_id for id in ids]
+        ordered_rows = [id_map[id] for id in ids]
+        body_ids = [row.body_id for row in ordered_rows]
+        brain_ids = [row.brain_id for row in ordered_rows]
 
         body_genotypes = await CppnwinGenotypeSerializer.from_database(
             session, body_ids
@@ -171,14 +181,11 @@ class GenotypeSerializer(Serializer[Genotype]):
             session, brain_ids
         )
 
-        random_seeds = await FloatSerializer.from_database(
-            session, seed_ids
-        )
-
-        genotypes = [
-            Genotype(body, brain, seed)
-            for body, brain, seed in zip(body_genotypes, brain_genotypes, random_seeds)
-        ]
+        genotypes: List[Genotype] = [None] * len(ids)  # type: ignore # filled directly below
+        for i, row in enumerate(ordered_rows):
+            genotypes[i] = Genotype(
+                body_genotypes[i], brain_genotypes[i], row.random_seed
+            )
 
         return genotypes
 
@@ -241,6 +248,104 @@ def mutate(
     )
 
 
+def mutate_batch(
+    genotypes: List[Genotype],
+    innov_db_body: multineat.InnovationDatabase,
+    innov_db_brain: multineat.InnovationDatabase,
+    rng: Random,
+    num_workers: int = 1,
+) -> List[Genotype]:
+    """
+    Mutate a batch of genotypes.
+
+    By default the batch is mutated serially on the calling process against
+    the shared innovation databases, which keeps NEAT semantics exact.
+
+    Passing num_workers > 1 spreads the mutations over a process pool.
+    Multineat objects do not pickle, so genomes and innovation databases then
+    travel to the workers in their multineat-serialized form and every worker
+    mutates against a private database copy. multineat exposes no way to merge
+    those copies back: with multiple workers, distinct structural genes can
+    receive the same innovation id and the caller's databases never learn
+    about worker innovations, while `crossover_v1` aligns genes by innovation
+    id. The number of draws taken from `rng` also depends on the worker
+    count. Only opt in when approximate innovation tracking is acceptable and
+    the worker count is fixed for the experiment.
+
+    :param genotypes: The genotypes to mutate. These objects are not altered.
+    :param innov_db_body: Multineat innovation database for the body. See Multineat library.
+    :param innov_db_brain: Multineat innovation database for the brain. See Multineat library.
+    :param rng: Random number generator.
+    :param num_workers: Number of worker processes. The default of 1 mutates serially.
+    :returns: Mutated copies of the provided genotypes, in the same order.
+    """
+    num_workers = min(num_workers, len(genotypes))
+
+    if num_workers <= 1:
+        return [
+            mutate(genotype, innov_db_body, innov_db_brain, rng)
+            for genotype in genotypes
+        ]
+
+    serialized = [
+        (genotype.body.genotype.Serialize(), genotype.brain.params_array, genotype.random_seed)
+        for genotype in genotypes
+    ]
+    chunk_size = (len(serialized) + num_workers - 1) // num_workers
+    chunks = [
+        serialized[i : i + chunk_size] for i in range(0, len(serialized), chunk_size)
+    ]
+
+    body_db_state = innov_db_body.Serialize()
+    brain_db_state = innov_db_brain.Serialize()
+    tasks = [
+        (chunk, body_db_state, brain_db_state, rng.randint(0, 2**31))
+        for chunk in chunks
+    ]
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        chunk_results = list(executor.map(_mutate_batch_worker, tasks))
+
+    offspring = []
+    for chunk_result in chunk_results:
+        for body_serialized, brain_params, random_seed in chunk_result:
+            body = CppnwinGenotype(multineat.Genome())
+            body.genotype.Deserialize(body_serialized)
+            offspring.append(Genotype(body, ArrayGenotype(brain_params), random_seed))
+    return offspring
+
+
+def _mutate_batch_worker(
+    args: Tuple[List[Tuple[str, Any, int]], str, str, int]
+) -> List[Tuple[str, Any, int]]:
+    serialized_genotypes, body_db_state, brain_db_state, seed = args
+
+    innov_db_body = multineat.InnovationDatabase()
+    innov_db_body.Deserialize(body_db_state)
+    innov_db_brain = multineat.InnovationDatabase()
+    innov_db_brain.Deserialize(brain_db_state)
+    rng = Random(seed)
+
+    results = []
+    for body_serialized, brain_params, random_seed in serialized_genotypes:
+        body = CppnwinGenotype(multineat.Genome())
+        body.genotype.Deserialize(body_serialized)
+        child = mutate(
+            Genotype(body, ArrayGenotype(brain_params), random_seed),
+            innov_db_body,
+            innov_db_brain,
+            rng,
+        )
+        results.append(
+            (
+                child.body.genotype.Serialize(),
+                child.brain.params_array,
+                child.random_seed,
+            )
+        )
+    return results
+
+
 def crossover(
     parent1: Genotype,
     parent2: Genotype,
@@ -270,7 +375,7 @@ def crossover(
             0.5,
             first_best
         )
-
+    
     if first_best:
         random_seed = parent1.random_seed
     else:
@@ -282,9 +387,40 @@ def crossover(
         random_seed
     )
 
+def sketch(genotype: Genotype) -> bytes:
+    """
+    Compute a cheap low-precision fingerprint of a genotype.
+
+    Hashes the serialized body genome, the querying seed and the sign bits of
+    the brain weights. Genotypes with equal sketches develop the same
+    morphology and a near-identical controller, so evaluation results can be
+    reused between them instead of learning the controller again.
+
+    :param genotype: The genotype to fingerprint. This object is not altered.
+    :returns: A 16 byte digest.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(genotype.body.genotype.Serialize().encode())
+    hasher.update(int(genotype.random_seed).to_bytes(8, "little", signed=True))
+    hasher.update(np.packbits(genotype.brain.params_array > 0).tobytes())
+    return hasher.digest()
+
+
+_THREAD_LOCAL = threading.local()
+
+
 def _multineat_rng_from_random(rng: Random) -> multineat.RNG:
-    multineat_rng = multineat.RNG()
-    multineat_rng.Seed(rng.randint(0, 2**31))
+    # reuse one multineat RNG per thread, seeded once per source generator;
+    # the C++ stream then advances on its own, so the variation loop pays
+    # neither an allocation nor a Python randint per call
+    multineat_rng = getattr(_THREAD_LOCAL, "multineat_rng", None)
+    if multineat_rng is None:
+        multineat_rng = multineat.RNG()
+        _THREAD_LOCAL.multineat_rng = multineat_rng
+        _THREAD_LOCAL.multineat_rng_source = None
+    if _THREAD_LOCAL.multineat_rng_source is not rng:
+        multineat_rng.Seed(rng.randint(0, 2**31))
+        _THREAD_LOCAL.multineat_rng_source = rng
     return multineat_rng
 
 
@@ -304,6 +440,25 @@ class DbGenotype(DbBase):
         primary_key=True,
     )
 
+    # declared widths are nominal: sqlite stores integers as 1-8 byte varints
+    # based on magnitude, so narrowing these types would not shrink the rows
     body_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
     brain_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
-    seed_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    # the seed is a small int, so store it inline instead of routing it
+    # through the float table
+    random_seed = sqlalchemy.Column(sqlalchemy.SmallInteger, nullable=False)
+
+    # covering index so the read in `from_database` can be answered from the
+    # index alone
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_genotype_covering", "id", "body_id", "brain_id", "random_seed"
+        ),
+    )
+
+
+# statement built once with an expanding IN parameter, so repeated reads reuse
+# the compiled-statement cache instead of compiling a fresh select per call
+_SELECT_GENOTYPE_BY_IDS = select(DbGenotype).filter(
+    DbGenotype.id.in_(sqlalchemy.bindparam("ids", expanding=True))
+)
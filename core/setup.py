@@ -25,12 +25,12 @@ setup(
         "matplotlib>=3.4.3",
         "scipy>=1.7.1",
         "pyrr>=0.10.3",
-        "sqlalchemy>=1.4.28",
+        "sqlalchemy>=2.0.10",
         "asyncssh>=2.9.0",
         "aiosqlite>=0.17.0",
         "pandas>=1.4.2",
     ],
-    extras_require={"dev": ["sqlalchemy[mypy]>=1.4.28"]},
+    extras_require={"dev": ["sqlalchemy[mypy]>=2.0.10"]},
     zip_safe=False,
     entry_points={
         "console_scripts": [